@@ -15,6 +15,7 @@ TESSERACT_PATH = r'C:\Program Files\Tesseract-OCR\tesseract.exe'  # Windows
 
 # Model Paths
 CASCADE_PATH = os.path.join(BASE_DIR, 'models', 'haarcascade_russian_plate_number.xml')
+ONNX_MODEL_PATH = os.path.join(BASE_DIR, 'models', 'plate_detector_int8.onnx')
 
 # Storage Paths
 SAVED_PLATES_DIR = os.path.join(BASE_DIR, 'saved_plates')
@@ -33,10 +34,18 @@ MAX_PLATE_AREA = 50000     # Maximum area (pixels²)
 MIN_PLATE_WIDTH = 100      # Minimum width (pixels)
 MIN_PLATE_HEIGHT = 30      # Minimum height (pixels)
 
+# Detector Backend
+DETECTOR_BACKEND = 'cascade'    # 'cascade' (Haar) or 'onnx' (YOLO model via ONNX Runtime)
+ONNX_INPUT_SIZE = 416           # Model input width/height (pixels)
+ONNX_CONF_THRESHOLD = 0.4       # Minimum box score to keep
+ONNX_NMS_THRESHOLD = 0.45       # IoU threshold for non-maximum suppression
+
 # Detection Parameters
 CASCADE_SCALE_FACTOR = 1.1  # How much image size is reduced at each scale
 CASCADE_MIN_NEIGHBORS = 5   # How many neighbors each rectangle should have
-FRAME_SKIP = 1              # Process every Nth frame (1 = all frames)
+DETECTION_INTERVAL = 0.0    # Minimum seconds between detection runs (0 = every frame)
+DETECTION_SCALE = 0.5       # Downscale factor for cascade input (1.0 = full size)
+USE_OPENCL = True           # Run detection on the GPU via OpenCL when available
 
 # ==================== OCR SETTINGS ====================
 CONFIDENCE_THRESHOLD = 0.6      # Minimum confidence to accept (0.0 - 1.0)
@@ -45,9 +54,10 @@ MIN_PLATE_LENGTH = 4            # Minimum characters in plate
 MAX_PLATE_LENGTH = 10           # Maximum characters in plate
 
 # OCR Configurations
-OCR_CONFIG_PSM7 = '--psm 7 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
-OCR_CONFIG_PSM8 = '--psm 8 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
-OCR_CONFIG_PSM13 = '--psm 13 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+OCR_CHAR_WHITELIST = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+OCR_CONFIG_PSM7 = f'--psm 7 -c tessedit_char_whitelist={OCR_CHAR_WHITELIST}'
+OCR_CONFIG_PSM8 = f'--psm 8 -c tessedit_char_whitelist={OCR_CHAR_WHITELIST}'
+OCR_CONFIG_PSM13 = f'--psm 13 -c tessedit_char_whitelist={OCR_CHAR_WHITELIST}'
 
 # ==================== SYSTEM SETTINGS ====================
 # Duplicate Prevention
@@ -62,6 +72,7 @@ CAMERA_FPS = 30                 # Target FPS
 # Performance
 MAX_DETECTION_TIME = 1.0        # Maximum time per detection (seconds)
 PERFORMANCE_BUFFER_SIZE = 30    # Number of frames to average for FPS
+STATS_CACHE_TTL = 1.0           # Seconds to reuse dashboard statistics
 
 # ==================== UI SETTINGS ====================
 # Colors (BGR format)
@@ -96,6 +107,11 @@ DB_VACUUM_ON_START = False      # Clean database on startup
 DB_BACKUP_ON_EXIT = True        # Backup database on exit
 MAX_RECORDS = 10000             # Maximum records before auto-cleanup
 
+# ==================== CSV EXPORT SETTINGS ====================
+CSV_FLUSH_ROWS = 16             # Write buffered rows after this many detections
+CSV_FLUSH_INTERVAL = 2.0        # ...or after this many seconds
+IMAGE_QUEUE_SIZE = 32           # Pending plate images before saves are dropped
+
 # ==================== VALIDATION ====================
 def validate_config():
     """Validate configuration settings"""
@@ -105,9 +121,15 @@ def validate_config():
     if not os.path.exists(TESSERACT_PATH):
         errors.append(f"Tesseract not found at: {TESSERACT_PATH}")
     
-    # Check if cascade file exists
-    if not os.path.exists(CASCADE_PATH):
-        errors.append(f"Cascade file not found at: {CASCADE_PATH}")
+    # Check if detector model exists
+    if DETECTOR_BACKEND == 'cascade':
+        if not os.path.exists(CASCADE_PATH):
+            errors.append(f"Cascade file not found at: {CASCADE_PATH}")
+    elif DETECTOR_BACKEND == 'onnx':
+        if not os.path.exists(ONNX_MODEL_PATH):
+            errors.append(f"ONNX model not found at: {ONNX_MODEL_PATH}")
+    else:
+        errors.append("DETECTOR_BACKEND must be 'cascade' or 'onnx'")
     
     # Check value ranges
     if not (0.0 <= CONFIDENCE_THRESHOLD <= 1.0):
@@ -116,14 +138,23 @@ def validate_config():
     if not (0.0 <= AUTO_SAVE_THRESHOLD <= 1.0):
         errors.append("AUTO_SAVE_THRESHOLD must be between 0.0 and 1.0")
     
-    if FRAME_SKIP < 1:
-        errors.append("FRAME_SKIP must be at least 1")
+    if DETECTION_INTERVAL < 0:
+        errors.append("DETECTION_INTERVAL must not be negative")
+    
+    if not (0.0 < DETECTION_SCALE <= 1.0):
+        errors.append("DETECTION_SCALE must be greater than 0.0 and at most 1.0")
     
     return errors
 
 # ==================== DIRECTORY CREATION ====================
+_directories_created = False
+
 def create_directories():
-    """Create necessary directories if they don't exist"""
+    """Create necessary directories if they don't exist (once per process)"""
+    global _directories_created
+    if _directories_created:
+        return
+    
     directories = [
         SAVED_PLATES_DIR,
         DATABASE_DIR,
@@ -137,6 +168,7 @@ def create_directories():
     for directory in directories:
         os.makedirs(directory, exist_ok=True)
     
+    _directories_created = True
     print("✓ All directories created/verified")
 
 # ==================== INITIALIZATION ====================
@@ -159,6 +191,7 @@ if __name__ == "__main__":
     
     print("\nConfiguration Summary:")
     print(f"  Tesseract: {TESSERACT_PATH}")
+    print(f"  Detector: {DETECTOR_BACKEND}")
     print(f"  Cascade: {CASCADE_PATH}")
     print(f"  Database: {DATABASE_FILE}")
     print(f"  CSV Export: {CSV_FILE}")
@@ -3,17 +3,17 @@ MAIN APPLICATION - Number Plate Recognition System
 Entry point with configuration integration
 """
 
-import cv2
-import pytesseract
-import pandas as pd
-import numpy as np
 import os
+import csv
+import atexit
 import sqlite3
 from datetime import datetime
 from collections import deque
 import time
 import re
 import sys
+import queue
+import threading
 
 # Import configuration
 try:
@@ -23,8 +23,30 @@ except ImportError:
     print("Please ensure config.py is in the same directory")
     sys.exit(1)
 
-# Set Tesseract path
-pytesseract.pytesseract.tesseract_cmd = config.TESSERACT_PATH
+# Heavy libraries, imported by load_dependencies() once the app starts
+cv2 = None
+np = None
+pytesseract = None
+tesserocr = None
+
+def load_dependencies():
+    """Import OpenCV, NumPy and Tesseract bindings on first use"""
+    global cv2, np, pytesseract, tesserocr
+    if cv2 is not None:
+        return
+    
+    import cv2
+    import numpy as np
+    import pytesseract
+    
+    # Optional in-process Tesseract bindings (falls back to pytesseract)
+    try:
+        import tesserocr
+    except ImportError:
+        tesserocr = None
+    
+    # Set Tesseract path
+    pytesseract.pytesseract.tesseract_cmd = config.TESSERACT_PATH
 
 # ==================== DATABASE INITIALIZATION ====================
 def init_database():
@@ -68,69 +90,115 @@ def init_database():
 
 # ==================== PREPROCESSING ====================
 class PlatePreprocessor:
-    """Image preprocessing for OCR"""
+    """Image preprocessing for OCR
+    
+    Each method takes the plate's grayscale image and its Gaussian blur,
+    computed once per plate by SmartOCR.
+    """
     
     @staticmethod
-    def adaptive_threshold(img):
+    def prepare(img):
         gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
         blur = cv2.GaussianBlur(gray, (5, 5), 0)
+        return gray, blur
+    
+    @staticmethod
+    def adaptive_threshold(gray, blur):
         thresh = cv2.adaptiveThreshold(blur, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
                                        cv2.THRESH_BINARY, 11, 2)
         return thresh
     
     @staticmethod
-    def otsu_threshold(img):
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        blur = cv2.GaussianBlur(gray, (5, 5), 0)
+    def otsu_threshold(gray, blur):
         _, thresh = cv2.threshold(blur, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
         return thresh
     
     @staticmethod
-    def clahe_enhance(img):
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    def clahe_enhance(gray, blur):
         clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
         enhanced = clahe.apply(gray)
         _, thresh = cv2.threshold(enhanced, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
         return thresh
 
 # ==================== OCR ENGINE ====================
+_PLATE_RE = re.compile(r'[A-Z0-9]+\Z')
+
 class SmartOCR:
     """Advanced OCR with multiple methods"""
     
+    # (pytesseract config, page segmentation mode) pairs to try
+    PSM_MODES = [(config.OCR_CONFIG_PSM7, 7), (config.OCR_CONFIG_PSM8, 8)]
+    
     def __init__(self):
         self.preprocessor = PlatePreprocessor()
+        
+        # In-process Tesseract API avoids a subprocess + temp file per call
+        self._api = None
+        if tesserocr is not None:
+            try:
+                self._api = tesserocr.PyTessBaseAPI(psm=tesserocr.PSM.SINGLE_LINE)
+                self._api.SetVariable('tessedit_char_whitelist', config.OCR_CHAR_WHITELIST)
+            except Exception as e:
+                print(f"tesserocr unavailable, using pytesseract: {e}")
+                self._api = None
+    
+    def read_words(self, processed, psm_config, psm):
+        """Run Tesseract on a binary image, return (words, confidences)"""
+        if self._api is not None:
+            h, w = processed.shape[:2]
+            self._api.SetPageSegMode(psm)
+            self._api.SetImageBytes(processed.tobytes(), w, h, 1, w)
+            pairs = self._api.MapWordConfidences()
+            if not pairs:
+                return [], []
+            words, confs = zip(*pairs)
+            return words, confs
+        
+        data = pytesseract.image_to_data(processed, config=psm_config,
+                                         output_type=pytesseract.Output.DICT)
+        return data['text'], data['conf']
     
     def extract_text(self, plate_img):
-        """Extract text using multiple methods"""
+        """Extract text using multiple methods
+        
+        Methods and PSM modes are tried in order of typical win-rate; the
+        search stops at the first valid result that is confident enough to
+        auto-save, so most plates need a single Tesseract call.
+        """
         methods = [
+            ('CLAHE', self.preprocessor.clahe_enhance),
             ('Adaptive', self.preprocessor.adaptive_threshold),
-            ('Otsu', self.preprocessor.otsu_threshold),
-            ('CLAHE', self.preprocessor.clahe_enhance)
+            ('Otsu', self.preprocessor.otsu_threshold)
         ]
         
         results = []
+        try:
+            gray, blur = self.preprocessor.prepare(plate_img)
+        except Exception:
+            return "", 0, "None"
         
         for method_name, method_func in methods:
             try:
-                processed = method_func(plate_img)
+                processed = method_func(gray, blur)
                 
-                for psm_config in [config.OCR_CONFIG_PSM7, config.OCR_CONFIG_PSM8]:
-                    data = pytesseract.image_to_data(processed, config=psm_config,
-                                                     output_type=pytesseract.Output.DICT)
-                    
-                    text = ""
-                    confidences = []
-                    
-                    for i, word in enumerate(data['text']):
-                        if int(data['conf'][i]) > 0:
-                            text += word
-                            confidences.append(int(data['conf'][i]))
+                for psm_config, psm in self.PSM_MODES:
+                    words, confs = self.read_words(processed, psm_config, psm)
                     
+                    # Keep only recognised words (Tesseract marks non-words with -1)
+                    confs = np.asarray(confs, dtype=np.int16)
+                    mask = confs > 0
+                    text = "".join([w for w, keep in zip(words, mask) if keep])
                     text = text.strip().replace(" ", "").upper()
                     
                     if text and len(text) >= config.MIN_PLATE_LENGTH:
-                        avg_conf = sum(confidences) / len(confidences) if confidences else 0
-                        results.append((text, avg_conf / 100, method_name))
+                        avg_conf = float(confs[mask].mean()) if mask.any() else 0
+                        result = (text, avg_conf / 100, method_name)
+                        
+                        # Early exit: good enough, skip remaining Tesseract calls
+                        if result[1] >= config.AUTO_SAVE_THRESHOLD and self.validate_plate(text):
+                            return result
+                        
+                        results.append(result)
             
             except Exception:
                 continue
@@ -144,30 +212,44 @@ class SmartOCR:
         """Validate plate format"""
         if len(text) < config.MIN_PLATE_LENGTH or len(text) > config.MAX_PLATE_LENGTH:
             return False
-        return bool(re.match(r'^[A-Z0-9]+$', text))
+        return _PLATE_RE.match(text) is not None
+    
+    def close(self):
+        """Release the in-process Tesseract API"""
+        if self._api is not None:
+            self._api.End()
+            self._api = None
 
 # ==================== DUPLICATE MANAGER ====================
 class DuplicateManager:
     """Prevent duplicate detections"""
     
+    PRUNE_INTERVAL = 100  # Calls between sweeps of expired entries
+    
     def __init__(self):
-        self.detected = deque()
+        self.last_seen = {}
+        self._calls = 0
+        self.lock = threading.Lock()  # Shared by detection worker and UI thread
     
     def is_duplicate(self, plate_text):
         """Check if plate detected recently"""
         current_time = time.time()
         
-        # Remove old entries
-        while self.detected and current_time - self.detected[0][1] > config.DUPLICATE_TIME_WINDOW:
-            self.detected.popleft()
-        
-        # Check duplicates
-        for plate, _ in self.detected:
-            if plate == plate_text:
+        with self.lock:
+            # Periodically remove old entries
+            self._calls += 1
+            if self._calls >= self.PRUNE_INTERVAL:
+                self._calls = 0
+                self.last_seen = {plate: ts for plate, ts in self.last_seen.items()
+                                  if current_time - ts <= config.DUPLICATE_TIME_WINDOW}
+            
+            # Check duplicates
+            last_time = self.last_seen.get(plate_text)
+            if last_time is not None and current_time - last_time <= config.DUPLICATE_TIME_WINDOW:
                 return True
-        
-        self.detected.append((plate_text, current_time))
-        return False
+            
+            self.last_seen[plate_text] = current_time
+            return False
 
 # ==================== PERFORMANCE MONITOR ====================
 class PerformanceMonitor:
@@ -185,83 +267,420 @@ class PerformanceMonitor:
         return 1.0 / (sum(self.frame_times) / len(self.frame_times))
 
 # ==================== DATA MANAGER ====================
+_INSERT_PLATE_SQL = '''
+    INSERT INTO plates (timestamp, plate_number, confidence, image_path,
+                      location, processing_time, detection_method)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+_STATS_SQL = '''
+    SELECT COUNT(*), COUNT(DISTINCT plate_number), AVG(confidence)
+    FROM plates WHERE DATE(timestamp) = ?
+'''
+
+_CSV_HEADER = ['Timestamp', 'Plate_Number', 'Confidence', 'Image_Path']
+
 class DataManager:
     """Handle data storage"""
     
+    def __init__(self):
+        # Single connection reused for all reads/writes (autocommit, WAL)
+        self.conn = sqlite3.connect(config.DATABASE_FILE, check_same_thread=False,
+                                    isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.cursor = self.conn.cursor()
+        self.lock = threading.Lock()  # Shared by detection worker and UI thread
+        
+        self._stats_cache = None
+        self._stats_ts = 0.0
+        self._csv_header_written = os.path.exists(config.CSV_FILE)
+        
+        # CSV rows are buffered and appended in batches
+        self._csv_buf = []
+        self._csv_last_flush = time.time()
+        atexit.register(self.flush_csv)  # Don't lose buffered rows on Ctrl+C
+        
+        # Plate images are written by a background thread
+        self.save_q = queue.Queue(maxsize=config.IMAGE_QUEUE_SIZE)
+        self.dropped_images = 0
+        self._writer = threading.Thread(target=self._write_images, daemon=True)
+        self._writer.start()
+    
+    def _write_images(self):
+        while True:
+            item = self.save_q.get()
+            if item is None:
+                break
+            img_path, img = item
+            try:
+                cv2.imwrite(img_path, img)
+            except Exception as e:
+                print(f"Image save error: {e}")
+    
+    def save_image(self, img_path, img):
+        """Queue an image for writing, return False if the queue is full"""
+        try:
+            self.save_q.put_nowait((img_path, img.copy()))
+            return True
+        except queue.Full:
+            self.dropped_images += 1
+            print(f"Image dropped (queue full), saving record without image: {img_path}")
+            return False
+    
     def save_detection(self, plate_data):
         """Save to database and CSV"""
         try:
-            # Database
-            conn = sqlite3.connect(config.DATABASE_FILE)
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO plates (timestamp, plate_number, confidence, image_path,
-                                  location, processing_time, detection_method)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', plate_data)
-            conn.commit()
-            conn.close()
-            
-            # CSV backup
-            df = pd.DataFrame([{
-                'Timestamp': plate_data[0],
-                'Plate_Number': plate_data[1],
-                'Confidence': f"{plate_data[2]:.2%}",
-                'Image_Path': plate_data[3]
-            }])
+            with self.lock:
+                # Database
+                self.cursor.execute(_INSERT_PLATE_SQL, plate_data)
+                
+                # CSV backup
+                self._csv_buf.append([plate_data[0], plate_data[1],
+                                      f"{plate_data[2]:.2%}", plate_data[3]])
+                
+                # Invalidate cached statistics
+                self._stats_ts = 0.0
             
-            if os.path.exists(config.CSV_FILE):
-                df.to_csv(config.CSV_FILE, mode='a', header=False, index=False)
-            else:
-                df.to_csv(config.CSV_FILE, index=False)
+            self.flush_csv_if_due()
             
             return True
         except Exception as e:
             print(f"Save error: {e}")
             return False
     
+    def flush_csv_if_due(self):
+        """Flush buffered CSV rows once the row or time limit is reached"""
+        if not self._csv_buf:
+            return
+        if (len(self._csv_buf) >= config.CSV_FLUSH_ROWS or
+                time.time() - self._csv_last_flush >= config.CSV_FLUSH_INTERVAL):
+            self.flush_csv()
+    
+    def flush_csv(self):
+        """Append buffered rows to the CSV file"""
+        with self.lock:
+            rows, self._csv_buf = self._csv_buf, []
+            self._csv_last_flush = time.time()
+            if not rows:
+                return
+            
+            try:
+                with open(config.CSV_FILE, 'a', newline='') as f:
+                    writer = csv.writer(f)
+                    if not self._csv_header_written:
+                        writer.writerow(_CSV_HEADER)
+                        self._csv_header_written = True
+                    writer.writerows(rows)
+            except Exception as e:
+                print(f"CSV write error: {e}")
+    
     def get_statistics(self):
-        """Get today's statistics"""
+        """Get today's statistics (cached for STATS_CACHE_TTL seconds)"""
+        now = time.time()
+        if self._stats_cache is not None and now - self._stats_ts < config.STATS_CACHE_TTL:
+            return self._stats_cache
+        
         try:
-            conn = sqlite3.connect(config.DATABASE_FILE)
-            cursor = conn.cursor()
             today = datetime.now().strftime('%Y-%m-%d')
             
-            cursor.execute('SELECT COUNT(*) FROM plates WHERE DATE(timestamp) = ?', (today,))
-            total = cursor.fetchone()[0]
+            # Query and cache update under one lock, so a concurrent save's
+            # invalidation cannot be overwritten with pre-save results
+            with self.lock:
+                self.cursor.execute(_STATS_SQL, (today,))
+                total, unique, avg_conf = self.cursor.fetchone()
+                
+                self._stats_cache = (total, unique, avg_conf or 0)
+                self._stats_ts = now
+                return self._stats_cache
+        except:
+            return 0, 0, 0
+    
+    def close(self):
+        """Flush pending writes and close the database connection"""
+        self.flush_csv()
+        self.save_q.put(None)
+        self._writer.join()
+        try:
+            self.conn.close()
+        except Exception as e:
+            print(f"Database close error: {e}")
+
+# ==================== PLATE DETECTORS ====================
+class CascadeDetector:
+    """Haar cascade plate detector"""
+    
+    def __init__(self, plate_cascade):
+        self.plate_cascade = plate_cascade
+        
+        # Run detection through OpenCV's T-API when OpenCL was enabled at startup
+        self.use_opencl = cv2.ocl.useOpenCL()
+        
+        # Reused across frames to avoid per-frame allocations
+        self._gray = None
+        self._small = None
+    
+    def detect(self, frame):
+        """Return plate boxes (x, y, w, h) in full-frame coordinates"""
+        # Detect on a downscaled frame, then map boxes back to full resolution
+        scale = config.DETECTION_SCALE
+        
+        if self.use_opencl:
+            # Upload once; conversion, resize and detection stay on the device
+            gray = cv2.cvtColor(cv2.UMat(frame), cv2.COLOR_BGR2GRAY)
+            if scale != 1.0:
+                gray = cv2.resize(gray, (0, 0), fx=scale, fy=scale,
+                                  interpolation=cv2.INTER_LINEAR)
+        else:
+            if self._gray is None or self._gray.shape != frame.shape[:2]:
+                self._gray = np.empty(frame.shape[:2], np.uint8)
+                self._small = None
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray)
+            if scale != 1.0:
+                gray = self._small = cv2.resize(gray, (0, 0), dst=self._small, fx=scale, fy=scale,
+                                                interpolation=cv2.INTER_LINEAR)
+        
+        plates = self.plate_cascade.detectMultiScale(
+            gray,
+            scaleFactor=config.CASCADE_SCALE_FACTOR,
+            minNeighbors=config.CASCADE_MIN_NEIGHBORS,
+            minSize=(int(config.MIN_PLATE_WIDTH * scale), int(config.MIN_PLATE_HEIGHT * scale))
+        )
+        
+        return [tuple(int(v / scale) for v in box) for box in plates]
+
+class OnnxPlateDetector:
+    """YOLO-style plate detector running on ONNX Runtime
+    
+    Expects a single-output model producing (1, 4 + classes, N) boxes in
+    centre/size format, as exported by YOLOv8. Use an INT8 model made with
+    onnxruntime.quantization.quantize_dynamic for best CPU throughput.
+    """
+    
+    def __init__(self, model_path):
+        import onnxruntime as ort
+        
+        available = ort.get_available_providers()
+        providers = [p for p in ('OpenVINOExecutionProvider', 'CPUExecutionProvider')
+                     if p in available]
+        self.session = ort.InferenceSession(model_path, providers=providers)
+        self.input_name = self.session.get_inputs()[0].name
+        self.input_size = config.ONNX_INPUT_SIZE
+    
+    def detect(self, frame):
+        """Return plate boxes (x, y, w, h) in full-frame coordinates"""
+        frame_h, frame_w = frame.shape[:2]
+        size = self.input_size
+        
+        # Resize, BGR->RGB, scale to [0, 1], NCHW float32
+        blob = cv2.dnn.blobFromImage(frame, 1 / 255.0, (size, size), swapRB=True)
+        preds = self.session.run(None, {self.input_name: blob})[0][0]
+        if preds.shape[0] < preds.shape[1]:
+            preds = preds.T  # -> (N, 4 + classes)
+        
+        scores = preds[:, 4:].max(axis=1)
+        keep = scores >= config.ONNX_CONF_THRESHOLD
+        preds, scores = preds[keep], scores[keep]
+        if not len(preds):
+            return []
+        
+        # Centre/size in model input space -> top-left/size in frame space
+        sx, sy = frame_w / size, frame_h / size
+        w = preds[:, 2] * sx
+        h = preds[:, 3] * sy
+        x = preds[:, 0] * sx - w / 2
+        y = preds[:, 1] * sy - h / 2
+        boxes = np.stack([x, y, w, h], axis=1)
+        
+        indices = cv2.dnn.NMSBoxes(boxes.tolist(), scores.tolist(),
+                                   config.ONNX_CONF_THRESHOLD, config.ONNX_NMS_THRESHOLD)
+        
+        plates = []
+        for i in np.array(indices).flatten():
+            bx, by, bw, bh = boxes[i]
+            
+            # Clip to the frame (boxes often extend past the edges)
+            x1, y1 = max(int(bx), 0), max(int(by), 0)
+            x2, y2 = min(int(bx + bw), frame_w), min(int(by + bh), frame_h)
+            if x2 <= x1 or y2 <= y1:
+                continue
+            plates.append((x1, y1, x2 - x1, y2 - y1))
+        return plates
+
+# ==================== DETECTION PIPELINE ====================
+def put_latest(q, item):
+    """Put item into a size-1 queue, dropping any stale item"""
+    try:
+        q.get_nowait()
+    except queue.Empty:
+        pass
+    try:
+        q.put_nowait(item)
+    except queue.Full:
+        pass
+
+def filter_plate_boxes(boxes, min_area, max_area):
+    """Return boxes (x, y, w, h) whose area lies within [min_area, max_area]"""
+    boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+    areas = boxes[:, 2] * boxes[:, 3]
+    return boxes[(areas >= min_area) & (areas <= max_area)]
+
+def save_plate(data_mgr, plate_img, plate_text, confidence, method, location):
+    """Save plate image and detection record"""
+    ts = datetime.now()
+    ts_str = ts.strftime('%Y-%m-%d %H:%M:%S')
+    img_stem = ts.strftime('%Y%m%d_%H%M%S')
+    img_path = os.path.join(config.SAVED_PLATES_DIR, f"plate_{img_stem}.jpg")
+    if not data_mgr.save_image(img_path, plate_img):
+        img_path = None  # Image was dropped; don't record a path with no file
+    
+    plate_data = (
+        ts_str,
+        plate_text,
+        confidence,
+        img_path,
+        location,
+        0,
+        method
+    )
+    return data_mgr.save_detection(plate_data)
+
+class FrameReader(threading.Thread):
+    """Read camera frames on a dedicated thread"""
+    
+    def __init__(self, cap, frame_queue):
+        super().__init__(daemon=True)
+        self.cap = cap
+        self.frame_queue = frame_queue
+        self.cond = threading.Condition()
+        self.frame = None
+        self.frame_id = 0
+        self.running = True
+        self._last_detect = 0.0
+    
+    def run(self):
+        while self.running:
+            ret, frame = self.cap.read()
+            if not ret:
+                break
             
-            cursor.execute('SELECT COUNT(DISTINCT plate_number) FROM plates WHERE DATE(timestamp) = ?', (today,))
-            unique = cursor.fetchone()[0]
+            with self.cond:
+                self.frame = frame
+                self.frame_id += 1
+                self.cond.notify_all()
             
-            cursor.execute('SELECT AVG(confidence) FROM plates WHERE DATE(timestamp) = ?', (today,))
-            avg_conf = cursor.fetchone()[0] or 0
+            # Throttle: hand a frame to detection at most every DETECTION_INTERVAL
+            now = time.time()
+            if now - self._last_detect >= config.DETECTION_INTERVAL:
+                self._last_detect = now
+                put_latest(self.frame_queue, frame)
+        
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        put_latest(self.frame_queue, None)  # Tell the worker to stop
+    
+    def get_frame(self, last_id, timeout=1.0):
+        """Wait for a frame newer than last_id, return (frame_id, frame)"""
+        with self.cond:
+            self.cond.wait_for(lambda: self.frame_id != last_id or not self.running, timeout)
+            return self.frame_id, self.frame
+    
+    def stop(self):
+        self.running = False
+
+class DetectionWorker(threading.Thread):
+    """Run plate detection, OCR and auto-save off the display thread"""
+    
+    def __init__(self, detector, ocr_engine, duplicate_mgr, data_mgr,
+                 frame_queue, result_queue):
+        super().__init__(daemon=True)
+        self.detector = detector
+        self.ocr_engine = ocr_engine
+        self.duplicate_mgr = duplicate_mgr
+        self.data_mgr = data_mgr
+        self.frame_queue = frame_queue
+        self.result_queue = result_queue
+        self.auto_save = config.ENABLE_AUTO_SAVE  # Toggled from the UI thread
+        self.running = True
+    
+    def run(self):
+        while self.running:
+            try:
+                frame = self.frame_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if frame is None:
+                break
             
-            conn.close()
-            return total, unique, avg_conf
-        except:
-            return 0, 0, 0
+            try:
+                detections = self.process(frame)
+            except Exception as e:
+                print(f"Detection error: {e}")
+                continue
+            
+            put_latest(self.result_queue, detections)
+    
+    def stop(self):
+        self.running = False
+    
+    def process(self, frame):
+        """Detect and read plates, return list of detections"""
+        boxes = filter_plate_boxes(self.detector.detect(frame),
+                                   config.MIN_PLATE_AREA, config.MAX_PLATE_AREA)
+        
+        detections = []
+        for (x, y, w, h) in boxes.tolist():
+            plate_img = frame[y:y+h, x:x+w]
+            plate_text, confidence, method = self.ocr_engine.extract_text(plate_img)
+            
+            if not self.ocr_engine.validate_plate(plate_text):
+                continue
+            
+            detections.append((x, y, w, h, plate_text, confidence, method, plate_img))
+            
+            # Auto-save
+            if self.auto_save and confidence >= config.AUTO_SAVE_THRESHOLD:
+                if not self.duplicate_mgr.is_duplicate(plate_text):
+                    save_plate(self.data_mgr, plate_img, plate_text, confidence, method, 'Auto')
+                    print(f"✓ Auto-saved: {plate_text} ({confidence*100:.1f}%)")
+        
+        return detections
 
 # ==================== UI FUNCTIONS ====================
+# Last rendered dashboard lines, keyed by the values they display
+_dashboard_key = None
+_dashboard_info = None
+_dashboard_bg = None  # Solid background tile, blended into the dashboard area
+
 def draw_dashboard(frame, stats, perf_monitor, mode, auto_save):
-    """Draw statistics dashboard"""
-    overlay = frame.copy()
-    cv2.rectangle(overlay, (10, 10), (410, 190), config.COLOR_DASHBOARD_BG, -1)
-    frame = cv2.addWeighted(overlay, 0.7, frame, 0.3, 0)
+    """Draw statistics dashboard (in place)"""
+    global _dashboard_key, _dashboard_info, _dashboard_bg
+    
+    # Darken only the dashboard area instead of blending the whole frame
+    roi = frame[10:11 + config.DASHBOARD_HEIGHT, 10:11 + config.DASHBOARD_WIDTH]
+    if _dashboard_bg is None or _dashboard_bg.shape != roi.shape:
+        _dashboard_bg = np.full(roi.shape, config.COLOR_DASHBOARD_BG, np.uint8)
+    roi[:] = cv2.addWeighted(_dashboard_bg, 0.7, roi, 0.3, 0)
     
     fps = perf_monitor.get_fps()
     total, unique, avg_conf = stats
     
-    info = [
-        ("PLATE RECOGNITION", (255, 255, 0), 0.8),
-        (f"FPS: {fps:.1f}", config.COLOR_TEXT, 0.6),
-        (f"Mode: {'AUTO' if auto_save else 'MANUAL'}", config.COLOR_TEXT, 0.6),
-        (f"Today: {total} detections", config.COLOR_TEXT, 0.6),
-        (f"Unique: {unique} plates", config.COLOR_TEXT, 0.6),
-        (f"Avg Conf: {avg_conf*100:.1f}%", config.COLOR_TEXT, 0.6)
-    ]
+    # Only reformat the text when a displayed value changes (FPS in whole frames)
+    key = (int(fps), total, unique, avg_conf, auto_save)
+    if key != _dashboard_key:
+        _dashboard_key = key
+        _dashboard_info = [
+            ("PLATE RECOGNITION", (255, 255, 0), 0.8),
+            (f"FPS: {int(fps)}", config.COLOR_TEXT, 0.6),
+            (f"Mode: {'AUTO' if auto_save else 'MANUAL'}", config.COLOR_TEXT, 0.6),
+            (f"Today: {total} detections", config.COLOR_TEXT, 0.6),
+            (f"Unique: {unique} plates", config.COLOR_TEXT, 0.6),
+            (f"Avg Conf: {avg_conf*100:.1f}%", config.COLOR_TEXT, 0.6)
+        ]
     
     y = 40
-    for text, color, size in info:
+    for text, color, size in _dashboard_info:
         cv2.putText(frame, text, (20, y), config.TEXT_FONT, size, color, 2)
         y += 28 if size > 0.7 else 25
     
@@ -299,6 +718,8 @@ def main():
     
     print("\n✓ Configuration validated")
     
+    load_dependencies()
+    
     # Initialize
     config.create_directories()
     if not init_database():
@@ -307,13 +728,31 @@ def main():
     
     print("✓ Database initialized")
     
-    # Load cascade
-    plate_cascade = cv2.CascadeClassifier(config.CASCADE_PATH)
-    if plate_cascade.empty():
-        print(f"❌ Cannot load cascade from: {config.CASCADE_PATH}")
-        return
-    
-    print("✓ Cascade loaded")
+    # Load detector
+    if config.DETECTOR_BACKEND == 'onnx':
+        try:
+            detector = OnnxPlateDetector(config.ONNX_MODEL_PATH)
+        except Exception as e:
+            print(f"❌ Cannot load ONNX model from: {config.ONNX_MODEL_PATH} ({e})")
+            return
+        
+        print("✓ ONNX detector loaded")
+    else:
+        plate_cascade = cv2.CascadeClassifier(config.CASCADE_PATH)
+        if plate_cascade.empty():
+            print(f"❌ Cannot load cascade from: {config.CASCADE_PATH}")
+            return
+        
+        print("✓ Cascade loaded")
+        
+        # OpenCL (T-API) offload
+        if config.USE_OPENCL and cv2.ocl.haveOpenCL():
+            cv2.ocl.setUseOpenCL(True)
+            print("✓ OpenCL enabled")
+        else:
+            cv2.ocl.setUseOpenCL(False)
+        
+        detector = CascadeDetector(plate_cascade)
     
     # Initialize components
     ocr_engine = SmartOCR()
@@ -340,122 +779,97 @@ def main():
     print("="*70 + "\n")
     
     # Application state
-    auto_save = config.ENABLE_AUTO_SAVE
     show_dashboard = config.ENABLE_DASHBOARD
-    frame_count = 0
+    
+    # Capture -> worker -> display, each hop holding only the latest item
+    frame_queue = queue.Queue(maxsize=1)
+    result_queue = queue.Queue(maxsize=1)
+    reader = FrameReader(cap, frame_queue)
+    worker = DetectionWorker(detector, ocr_engine, duplicate_mgr, data_mgr,
+                             frame_queue, result_queue)
+    reader.start()
+    worker.start()
+    
+    detections = []
+    frame_id = 0
+    last_display = time.time()
     
     while True:
-        frame_start = time.time()
-        
-        ret, frame = cap.read()
-        if not ret:
-            break
-        
-        frame_count += 1
-        display_frame = frame.copy()
-        
-        # Frame skipping
-        if frame_count % config.FRAME_SKIP != 0:
-            cv2.imshow('Plate Recognition', display_frame)
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                break
-            continue
-        
-        # Detection
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        plates = plate_cascade.detectMultiScale(
-            gray,
-            scaleFactor=config.CASCADE_SCALE_FACTOR,
-            minNeighbors=config.CASCADE_MIN_NEIGHBORS,
-            minSize=(config.MIN_PLATE_WIDTH, config.MIN_PLATE_HEIGHT)
-        )
-        
-        # Process plates
-        for (x, y, w, h) in plates:
-            area = w * h
-            if area < config.MIN_PLATE_AREA or area > config.MAX_PLATE_AREA:
-                continue
+        # Redraw only when the camera delivered a new frame
+        new_id, frame = reader.get_frame(frame_id, timeout=0.1)
+        if new_id != frame_id:
+            frame_id = new_id
             
-            plate_img = frame[y:y+h, x:x+w]
-            plate_text, confidence, method = ocr_engine.extract_text(plate_img)
+            # Latest detection results (kept until the worker publishes newer ones)
+            try:
+                detections = result_queue.get_nowait()
+            except queue.Empty:
+                pass
             
-            if not ocr_engine.validate_plate(plate_text):
-                continue
+            # Only copy when drawing; the worker and saved crops may still use this frame
+            display_frame = frame
+            if detections or show_dashboard:
+                display_frame = frame.copy()
             
-            # Draw detection
-            draw_detection_box(display_frame, x, y, w, h, plate_text, confidence)
+            # Draw detections
+            for (x, y, w, h, plate_text, confidence, _, _) in detections:
+                draw_detection_box(display_frame, x, y, w, h, plate_text, confidence)
             
-            # Auto-save
-            if auto_save and confidence >= config.AUTO_SAVE_THRESHOLD:
-                if not duplicate_mgr.is_duplicate(plate_text):
-                    timestamp = datetime.now()
-                    img_name = f"plate_{timestamp.strftime('%Y%m%d_%H%M%S')}.jpg"
-                    img_path = os.path.join(config.SAVED_PLATES_DIR, img_name)
-                    cv2.imwrite(img_path, plate_img)
-                    
-                    plate_data = (
-                        timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                        plate_text,
-                        confidence,
-                        img_path,
-                        'Auto',
-                        0,
-                        method
-                    )
-                    data_mgr.save_detection(plate_data)
-                    print(f"✓ Auto-saved: {plate_text} ({confidence*100:.1f}%)")
-        
-        # Dashboard
-        if show_dashboard:
-            stats = data_mgr.get_statistics()
-            display_frame = draw_dashboard(display_frame, stats, perf_monitor, "AUTO" if auto_save else "MANUAL", auto_save)
-        
-        # Display
-        cv2.imshow('Plate Recognition - Press Q to Quit', display_frame)
+            # Dashboard
+            if show_dashboard:
+                stats = data_mgr.get_statistics()
+                display_frame = draw_dashboard(display_frame, stats, perf_monitor,
+                                               "AUTO" if worker.auto_save else "MANUAL",
+                                               worker.auto_save)
+            
+            # Display
+            cv2.imshow('Plate Recognition - Press Q to Quit', display_frame)
+            
+            # Performance
+            now = time.time()
+            perf_monitor.add_frame_time(now - last_display)
+            last_display = now
+        elif not reader.running:
+            break
         
-        # Performance
-        frame_time = time.time() - frame_start
-        perf_monitor.add_frame_time(frame_time)
+        # Time-based CSV flush, even when no new detections arrive
+        data_mgr.flush_csv_if_due()
         
-        # Controls
+        # Controls (single event pump per iteration)
         key = cv2.waitKey(1) & 0xFF
         
         if key == ord('q'):
             break
         elif key == ord('a'):
-            auto_save = not auto_save
-            print(f"✓ Auto-save: {'ON' if auto_save else 'OFF'}")
+            worker.auto_save = not worker.auto_save
+            print(f"✓ Auto-save: {'ON' if worker.auto_save else 'OFF'}")
         elif key == ord('d'):
             show_dashboard = not show_dashboard
-        elif key in [ord('s'), 32] and len(plates) > 0:
-            (x, y, w, h) = plates[0]
-            plate_img = frame[y:y+h, x:x+w]
-            plate_text, confidence, method = ocr_engine.extract_text(plate_img)
+        elif key in [ord('s'), 32] and detections:
+            (_, _, _, _, plate_text, confidence, method, plate_img) = detections[0]
             
             if plate_text and not duplicate_mgr.is_duplicate(plate_text):
-                timestamp = datetime.now()
-                img_name = f"plate_{timestamp.strftime('%Y%m%d_%H%M%S')}.jpg"
-                img_path = os.path.join(config.SAVED_PLATES_DIR, img_name)
-                cv2.imwrite(img_path, plate_img)
-                
-                plate_data = (
-                    timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                    plate_text,
-                    confidence,
-                    img_path,
-                    'Manual',
-                    0,
-                    method
-                )
-                data_mgr.save_detection(plate_data)
+                save_plate(data_mgr, plate_img, plate_text, confidence, method, 'Manual')
                 print(f"✓ Saved: {plate_text} ({confidence*100:.1f}%)")
     
-    # Cleanup
-    cap.release()
+    # Cleanup: the worker finishes its current frame (OCR + saves) before
+    # the OCR engine and data manager are torn down
+    reader.stop()
+    worker.stop()
+    worker.join()
+    ocr_engine.close()
+    
+    # cap.read() may block on a stalled camera; never release it under the reader
+    reader.join(timeout=2.0)
+    if reader.is_alive():
+        print("⚠ Camera reader did not stop; skipping camera release")
+    else:
+        cap.release()
     cv2.destroyAllWindows()
     
     # Summary
     total, unique, avg_conf = data_mgr.get_statistics()
+    data_mgr.close()
     print("\n" + "="*70)
     print("  SESSION SUMMARY")
     print("="*70)
@@ -463,6 +877,8 @@ def main():
     print(f"Unique plates: {unique}")
     print(f"Average confidence: {avg_conf*100:.1f}%")
     print(f"Average FPS: {perf_monitor.get_fps():.1f}")
+    if data_mgr.dropped_images:
+        print(f"Records saved without image (queue full): {data_mgr.dropped_images}")
     print(f"\nData saved in:")
     print(f"  Database: {config.DATABASE_FILE}")
     print(f"  CSV: {config.CSV_FILE}")